@@ -2,347 +2,374 @@
 
 # Parses glibc .abilist files into a machine readable data structure.
 
+import collections
+import concurrent.futures
 import json
 import os
 import pathlib
+import re
 import sys
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
-# glibc config -> (os, arch, subarch)
+
+# glibc config -> ((os, arch, subarch), ...)
 TARGETS_TO_SOURCES = {
-    "aarch64-linux-gnu": [
-        ("unix", "aarch64", []),
-    ],
-    "aarch64-linux-gnu-disable-multi-arch": [
-        ("unix", "aarch64", []),
-    ],
-    "aarch64_be-linux-gnu": [
-        ("unix", "aarch64", []),
-    ],
-    "alpha-linux-gnu": [
-        ("unix", "alpha", []),
-    ],
-    "arc-linux-gnu": [
-        ("unix", "arc", []),
-    ],
-    "arc-linux-gnuhf": [
-        ("unix", "arc", []),
-    ],
-    "arceb-linux-gnu": [
-        ("unix", "arc", []),
-    ],
-    "arm-linux-gnueabi": [
-        ("unix", "arm", ["le"]),
-    ],
-    "arm-linux-gnueabi-v4t": [
-        ("unix", "arm", ["le"]),
-    ],
-    "arm-linux-gnueabihf": [
-        ("unix", "arm", ["le"]),
-    ],
-    "arm-linux-gnueabihf-v7a": [
-        ("unix", "arm", ["le"]),
-    ],
-    "arm-linux-gnueabihf-v7a-disable-multi-arch": [
-        ("unix", "arm", ["le"]),
-    ],
-    "armeb-linux-gnueabi": [
-        ("unix", "arm", ["be"]),
-    ],
-    "armeb-linux-gnueabi-be8": [
-        ("unix", "arm", ["be"]),
-    ],
-    "armeb-linux-gnueabihf": [
-        ("unix", "arm", ["be"]),
-    ],
-    "armeb-linux-gnueabihf-be8": [
-        ("unix", "arm", ["be"]),
-    ],
-    "csky-linux-gnuabiv2": [
-        ("unix", "csky", []),
-    ],
-    "csky-linux-gnuabiv2-soft": [
-        ("unix", "csky", []),
-    ],
-    "hppa-linux-gnu": [
-        ("unix", "hppa", []),
-    ],
-    "i486-linux-gnu": [
-        ("unix", "x86_64", []),
-        ("unix", "x86_64", "x32"),
-    ],
-    "i586-linux-gnu": [
-        ("unix", "x86_64", []),
-        ("unix", "x86_64", "x32"),
-    ],
-    "i686-gnu": [
-        ("mach", "hurd", []),
-        ("mach", "hurd", ["i386"]),
-    ],
-    "i686-linux-gnu": [
-        ("unix", "x86_64", []),
-        ("unix", "x86_64", ["x32"]),
-    ],
-    "i686-linux-gnu-disable-multi-arch": [
-        ("unix", "x86_64", []),
-        ("unix", "x86_64", ["x32"]),
-    ],
-    "i686-linux-gnu-static-pie": [
-        ("unix", "x86_64", []),
-        ("unix", "x86_64", ["x32"]),
-    ],
-    "ia64-linux-gnu": [
-        ("unix", "ia64", []),
-    ],
-    "m68k-linux-gnu": [
-        ("unix", "m68k", ["m680x0"]),
-    ],
-    "m68k-linux-gnu-coldfire": [
-        ("unix", "m68k", ["coldfire"]),
-    ],
-    "m68k-linux-gnu-coldfire-soft": [
-        ("unix", "m68k", ["coldfire"]),
-    ],
-    "microblaze-linux-gnu": [
-        ("unix", "microblaze", []),
-        ("unix", "microblaze", ["be"]),
-    ],
-    "microblazeel-linux-gnu": [
-        ("unix", "microblaze", []),
-        ("unix", "microblaze", ["le"]),
-    ],
-    "mips-linux-gnu": [
-        ("unix", "mips", ["mips32"]),
-        ("unix", "mips", ["mips32", "fpu"]),
-    ],
-    "mips-linux-gnu-nan2008": [
-        ("unix", "mips", ["mips32"]),
-        ("unix", "mips", ["mips32", "fpu"]),
-    ],
-    "mips-linux-gnu-nan2008-soft": [
-        ("unix", "mips", ["mips32"]),
-        ("unix", "mips", ["mips32", "nofpu"]),
-    ],
-    "mips-linux-gnu-soft": [
-        ("unix", "mips", ["mips32"]),
-        ("unix", "mips", ["mips32", "nofpu"]),
-    ],
+    "aarch64-linux-gnu": (
+        ("unix", "aarch64", ()),
+    ),
+    "aarch64-linux-gnu-disable-multi-arch": (
+        ("unix", "aarch64", ()),
+    ),
+    "aarch64_be-linux-gnu": (
+        ("unix", "aarch64", ()),
+    ),
+    "alpha-linux-gnu": (
+        ("unix", "alpha", ()),
+    ),
+    "arc-linux-gnu": (
+        ("unix", "arc", ()),
+    ),
+    "arc-linux-gnuhf": (
+        ("unix", "arc", ()),
+    ),
+    "arceb-linux-gnu": (
+        ("unix", "arc", ()),
+    ),
+    "arm-linux-gnueabi": (
+        ("unix", "arm", ("le",)),
+    ),
+    "arm-linux-gnueabi-v4t": (
+        ("unix", "arm", ("le",)),
+    ),
+    "arm-linux-gnueabihf": (
+        ("unix", "arm", ("le",)),
+    ),
+    "arm-linux-gnueabihf-v7a": (
+        ("unix", "arm", ("le",)),
+    ),
+    "arm-linux-gnueabihf-v7a-disable-multi-arch": (
+        ("unix", "arm", ("le",)),
+    ),
+    "armeb-linux-gnueabi": (
+        ("unix", "arm", ("be",)),
+    ),
+    "armeb-linux-gnueabi-be8": (
+        ("unix", "arm", ("be",)),
+    ),
+    "armeb-linux-gnueabihf": (
+        ("unix", "arm", ("be",)),
+    ),
+    "armeb-linux-gnueabihf-be8": (
+        ("unix", "arm", ("be",)),
+    ),
+    "csky-linux-gnuabiv2": (
+        ("unix", "csky", ()),
+    ),
+    "csky-linux-gnuabiv2-soft": (
+        ("unix", "csky", ()),
+    ),
+    "hppa-linux-gnu": (
+        ("unix", "hppa", ()),
+    ),
+    "i486-linux-gnu": (
+        ("unix", "x86_64", ()),
+        ("unix", "x86_64", ("x32",)),
+    ),
+    "i586-linux-gnu": (
+        ("unix", "x86_64", ()),
+        ("unix", "x86_64", ("x32",)),
+    ),
+    "i686-gnu": (
+        ("mach", "hurd", ()),
+        ("mach", "hurd", ("i386",)),
+    ),
+    "i686-linux-gnu": (
+        ("unix", "x86_64", ()),
+        ("unix", "x86_64", ("x32",)),
+    ),
+    "i686-linux-gnu-disable-multi-arch": (
+        ("unix", "x86_64", ()),
+        ("unix", "x86_64", ("x32",)),
+    ),
+    "i686-linux-gnu-static-pie": (
+        ("unix", "x86_64", ()),
+        ("unix", "x86_64", ("x32",)),
+    ),
+    "ia64-linux-gnu": (
+        ("unix", "ia64", ()),
+    ),
+    "m68k-linux-gnu": (
+        ("unix", "m68k", ("m680x0",)),
+    ),
+    "m68k-linux-gnu-coldfire": (
+        ("unix", "m68k", ("coldfire",)),
+    ),
+    "m68k-linux-gnu-coldfire-soft": (
+        ("unix", "m68k", ("coldfire",)),
+    ),
+    "microblaze-linux-gnu": (
+        ("unix", "microblaze", ()),
+        ("unix", "microblaze", ("be",)),
+    ),
+    "microblazeel-linux-gnu": (
+        ("unix", "microblaze", ()),
+        ("unix", "microblaze", ("le",)),
+    ),
+    "mips-linux-gnu": (
+        ("unix", "mips", ("mips32",)),
+        ("unix", "mips", ("mips32", "fpu")),
+    ),
+    "mips-linux-gnu-nan2008": (
+        ("unix", "mips", ("mips32",)),
+        ("unix", "mips", ("mips32", "fpu")),
+    ),
+    "mips-linux-gnu-nan2008-soft": (
+        ("unix", "mips", ("mips32",)),
+        ("unix", "mips", ("mips32", "nofpu")),
+    ),
+    "mips-linux-gnu-soft": (
+        ("unix", "mips", ("mips32",)),
+        ("unix", "mips", ("mips32", "nofpu")),
+    ),
     # TODO define these
-    "mips64-linux-gnu-n32": [],
-    "mips64-linux-gnu-n32-nan2008": [],
-    "mips64-linux-gnu-n32-nan2008-soft": [],
-    "mips64-linux-gnu-n32-soft": [],
-    "mips64-linux-gnu-n64": [],
-    "mips64-linux-gnu-n64-nan2008": [],
-    "mips64-linux-gnu-n64-nan2008-soft": [],
-    "mips64-linux-gnu-n64-soft": [],
-    "mips64el-linux-gnu-n32": [],
-    "mips64el-linux-gnu-n32-nan2008": [],
-    "mips64el-linux-gnu-n32-nan2008-soft": [],
-    "mips64el-linux-gnu-n32-soft": [],
-    "mips64el-linux-gnu-n64": [],
-    "mips64el-linux-gnu-n64-nan2008": [],
-    "mips64el-linux-gnu-n64-nan2008-soft": [],
-    "mips64el-linux-gnu-n64-soft": [],
-    "mipsel-linux-gnu": [],
-    "mipsel-linux-gnu-nan2008": [],
-    "mipsel-linux-gnu-nan2008-soft": [],
-    "mipsel-linux-gnu-soft": [],
-    "mipsisa32r6el-linux-gnu": [],
-    "mipsisa64r6el-linux-gnu-n32": [],
-    "mipsisa64r6el-linux-gnu-n64": [],
-
-    "nios2-linux-gnu": [
-        ("unix", "nios2", []),
-    ],
-    "powerpc-linux-gnu": [
-        ("unix", "powerpc", ["powerpc32"]),
-        ("unix", "powerpc", ["powerpc32", "fpu"]),
-    ],
-    "powerpc-linux-gnu-power4": [
-        ("unix", "powerpc", ["powerpc32"]),
-        ("unix", "powerpc", ["powerpc32", "fpu"]),
-    ],
-    "powerpc-linux-gnu-soft": [
-        ("unix", "powerpc", ["powerpc32"]),
-        ("unix", "powerpc", ["powerpc32", "nofpu"]),
-    ],
-    "powerpc64-linux-gnu": [
-        ("unix", "powerpc", ["powerpc64", "be"]),
-    ],
-    "powerpc64le-linux-gnu": [
-        ("unix", "powerpc", ["powerpc64", "le"]),
-    ],
-    "riscv32-linux-gnu-rv32imac-ilp32": [
-        ("unix", "riscv", ["rv32"]),
-    ],
-    "riscv32-linux-gnu-rv32imac-ilp32d": [
-        ("unix", "riscv", ["rv32"]),
-    ],
-    "riscv64-linux-gnu-rv64imac-lp64": [
-        ("unix", "riscv", ["rv64"]),
-    ],
-    "riscv64-linux-gnu-rv64imafdc-lp64": [
-        ("unix", "riscv", ["rv64"]),
-    ],
-    "riscv64-linux-gnu-rv64imafdc-lp64d": [
-        ("unix", "riscv", ["rv64"]),
-    ],
-    "s390-linux-gnu": [
-        ("unix", "s390", []),
-        ("unix", "s390", ["s390-32"]),
-    ],
-    "s390x-linux-gnu": [
-        ("unix", "s390", []),
-        ("unix", "s390", ["s390-64"]),
-    ],
-    "s390x-linux-gnu-O3": [
-        ("unix", "s390", []),
-        ("unix", "s390", ["s390-64"]),
-    ],
-    "sh3-linux-gnu": [
-        ("unix", "sh", ["le"]),
-    ],
-    "sh3eb-linux-gnu": [
-        ("unix", "sh", ["be"]),
-    ],
-    "sh4-linux-gnu": [
-        ("unix", "sh", ["le"]),
-    ],
-    "sh4-linux-gnu-soft": [
-        ("unix", "sh", ["le"]),
-    ],
-    "sh4eb-linux-gnu": [
-        ("unix", "sh", ["be"]),
-    ],
-    "sh4eb-linux-gnu-soft": [
-        ("unix", "sh", ["be"]),
-    ],
-    "sparc64-linux-gnu": [
-        ("unix", "sparc", ["sparc64"]),
-    ],
-    "sparc64-linux-gnu-disable-multi-arch": [
-        ("unix", "sparc", ["sparc64"]),
-    ],
-    "sparcv8-linux-gnu-leon3": [
-        ("unix", "sparc", ["sparc32"]),
-    ],
-    "sparcv9-linux-gnu": [
-        ("unix", "sparc", ["sparc32"]),
-    ],
-    "sparcv9-linux-gnu-disable-multi-arch": [
-        ("unix", "sparc", ["sparc32"]),
-    ],
-    "x86_64-linux-gnu": [
-        ("unix", "x86_64", []),
-        ("unix", "x86_64", ["64"]),
-    ],
-    "x86_64-linux-gnu-disable-multi-arch": [
-        ("unix", "x86_64", []),
-        ("unix", "x86_64", ["64"]),
-    ],
-    "x86_64-linux-gnu-static-pie": [
-        ("unix", "x86_64", []),
-        ("unix", "x86_64", ["64"]),
-    ],
-    "x86_64-linux-gnu-x32": [
-        ("unix", "x86_64", []),
-        ("unix", "x86_64", ["x32"]),
-    ],
-    "x86_64-linux-gnu-x32-static-pie": [
-        ("unix", "x86_64", []),
-        ("unix", "x86_64", ["x32"]),
-    ],
+    "mips64-linux-gnu-n32": (),
+    "mips64-linux-gnu-n32-nan2008": (),
+    "mips64-linux-gnu-n32-nan2008-soft": (),
+    "mips64-linux-gnu-n32-soft": (),
+    "mips64-linux-gnu-n64": (),
+    "mips64-linux-gnu-n64-nan2008": (),
+    "mips64-linux-gnu-n64-nan2008-soft": (),
+    "mips64-linux-gnu-n64-soft": (),
+    "mips64el-linux-gnu-n32": (),
+    "mips64el-linux-gnu-n32-nan2008": (),
+    "mips64el-linux-gnu-n32-nan2008-soft": (),
+    "mips64el-linux-gnu-n32-soft": (),
+    "mips64el-linux-gnu-n64": (),
+    "mips64el-linux-gnu-n64-nan2008": (),
+    "mips64el-linux-gnu-n64-nan2008-soft": (),
+    "mips64el-linux-gnu-n64-soft": (),
+    "mipsel-linux-gnu": (),
+    "mipsel-linux-gnu-nan2008": (),
+    "mipsel-linux-gnu-nan2008-soft": (),
+    "mipsel-linux-gnu-soft": (),
+    "mipsisa32r6el-linux-gnu": (),
+    "mipsisa64r6el-linux-gnu-n32": (),
+    "mipsisa64r6el-linux-gnu-n64": (),
+
+    "nios2-linux-gnu": (
+        ("unix", "nios2", ()),
+    ),
+    "powerpc-linux-gnu": (
+        ("unix", "powerpc", ("powerpc32",)),
+        ("unix", "powerpc", ("powerpc32", "fpu")),
+    ),
+    "powerpc-linux-gnu-power4": (
+        ("unix", "powerpc", ("powerpc32",)),
+        ("unix", "powerpc", ("powerpc32", "fpu")),
+    ),
+    "powerpc-linux-gnu-soft": (
+        ("unix", "powerpc", ("powerpc32",)),
+        ("unix", "powerpc", ("powerpc32", "nofpu")),
+    ),
+    "powerpc64-linux-gnu": (
+        ("unix", "powerpc", ("powerpc64", "be")),
+    ),
+    "powerpc64le-linux-gnu": (
+        ("unix", "powerpc", ("powerpc64", "le")),
+    ),
+    "riscv32-linux-gnu-rv32imac-ilp32": (
+        ("unix", "riscv", ("rv32",)),
+    ),
+    "riscv32-linux-gnu-rv32imac-ilp32d": (
+        ("unix", "riscv", ("rv32",)),
+    ),
+    "riscv64-linux-gnu-rv64imac-lp64": (
+        ("unix", "riscv", ("rv64",)),
+    ),
+    "riscv64-linux-gnu-rv64imafdc-lp64": (
+        ("unix", "riscv", ("rv64",)),
+    ),
+    "riscv64-linux-gnu-rv64imafdc-lp64d": (
+        ("unix", "riscv", ("rv64",)),
+    ),
+    "s390-linux-gnu": (
+        ("unix", "s390", ()),
+        ("unix", "s390", ("s390-32",)),
+    ),
+    "s390x-linux-gnu": (
+        ("unix", "s390", ()),
+        ("unix", "s390", ("s390-64",)),
+    ),
+    "s390x-linux-gnu-O3": (
+        ("unix", "s390", ()),
+        ("unix", "s390", ("s390-64",)),
+    ),
+    "sh3-linux-gnu": (
+        ("unix", "sh", ("le",)),
+    ),
+    "sh3eb-linux-gnu": (
+        ("unix", "sh", ("be",)),
+    ),
+    "sh4-linux-gnu": (
+        ("unix", "sh", ("le",)),
+    ),
+    "sh4-linux-gnu-soft": (
+        ("unix", "sh", ("le",)),
+    ),
+    "sh4eb-linux-gnu": (
+        ("unix", "sh", ("be",)),
+    ),
+    "sh4eb-linux-gnu-soft": (
+        ("unix", "sh", ("be",)),
+    ),
+    "sparc64-linux-gnu": (
+        ("unix", "sparc", ("sparc64",)),
+    ),
+    "sparc64-linux-gnu-disable-multi-arch": (
+        ("unix", "sparc", ("sparc64",)),
+    ),
+    "sparcv8-linux-gnu-leon3": (
+        ("unix", "sparc", ("sparc32",)),
+    ),
+    "sparcv9-linux-gnu": (
+        ("unix", "sparc", ("sparc32",)),
+    ),
+    "sparcv9-linux-gnu-disable-multi-arch": (
+        ("unix", "sparc", ("sparc32",)),
+    ),
+    "x86_64-linux-gnu": (
+        ("unix", "x86_64", ()),
+        ("unix", "x86_64", ("64",)),
+    ),
+    "x86_64-linux-gnu-disable-multi-arch": (
+        ("unix", "x86_64", ()),
+        ("unix", "x86_64", ("64",)),
+    ),
+    "x86_64-linux-gnu-static-pie": (
+        ("unix", "x86_64", ()),
+        ("unix", "x86_64", ("64",)),
+    ),
+    "x86_64-linux-gnu-x32": (
+        ("unix", "x86_64", ()),
+        ("unix", "x86_64", ("x32",)),
+    ),
+    "x86_64-linux-gnu-x32-static-pie": (
+        ("unix", "x86_64", ()),
+        ("unix", "x86_64", ("x32",)),
+    ),
 }
 
 
-def find_abilist_files(source: pathlib.Path) -> list[pathlib.Path]:
-    """Finds .abilist files in a directory tree."""
-    res = []
+# A line in an .abilist file: <version> <symbol> <type> [<address>]
+ABILIST_LINE_RE = re.compile(r"^(\S+) (\S+) (\S+)(?: (\S+))?\n", re.MULTILINE)
 
-    for root, dirs, files in os.walk(source):
-        root = pathlib.Path(root)
+# Path of an .abilist file relative to the source root:
+# sysdeps/(mach/hurd|unix/sysv/linux)/<arch>[/<subarch>...]/<lib>.abilist
+ABILIST_PATH_RE = re.compile(
+    r"sysdeps/(mach/hurd|unix/sysv/linux)/([^/]+)/(?:(.+)/)?([^/]+)\.abilist"
+)
 
-        # Make traversal deterministic.
-        dirs.sort()
 
-        for f in sorted(files):
-            if not f.endswith(".abilist"):
-                continue
+def find_abilist_files(source: pathlib.Path) -> list[str]:
+    """Finds .abilist files in a directory tree.
 
-            p = root / f
+    Paths are returned as strings prefixed with ``str(source)``.
+    """
 
-            # Ignore empty files.
-            if p.stat().st_size == 0:
-                continue
+    def walk(d: str):
+        with os.scandir(d) as it:
+            # Make traversal deterministic.
+            entries = sorted(it, key=lambda e: e.name)
 
-            res.append(p)
+        dirs = []
 
-    return res
+        for entry in entries:
+            # The name check is free and rules out nearly every entry. The
+            # file type usually comes from readdir() and needs no syscall.
+            if entry.name.endswith(".abilist") and entry.is_file(follow_symlinks=False):
+                # Ignore empty files.
+                if entry.stat(follow_symlinks=False).st_size:
+                    yield entry.path
+            elif entry.is_dir(follow_symlinks=False):
+                dirs.append(entry.path)
 
+        for d in dirs:
+            yield from walk(d)
 
-def parse_abilist(path: pathlib.Path):
-    """Parse a .abilist file into a data structure."""
-    functions = {}
-    data = {}
+    return list(walk(str(source)))
 
-    with path.open("r", encoding="ascii") as fh:
-        for line in fh:
-            parts = line.split()
 
-            symver = parts[0]
-            symbol = parts[1]
-            typ = parts[2]
+def parse_abilist(path: str):
+    """Parse a .abilist file into a data structure.
 
-            if typ == "F":
-                functions[symbol] = {"version": symver}
-            elif typ == "D":
-                address = parts[3]
-                data[symbol] = {
-                    "version": symver,
-                    "address": address,
-                }
-            else:
-                raise Exception("unhandled symbol type in %s: %s" % (path, parts))
+    ``functions`` maps symbol names to their version. ``data`` maps symbol
+    names to a dict holding their version and address.
+    """
+    # Collect (symbol, value) pairs and build each dict in one go at the end.
+    functions = []
+    data = []
 
-    return {
-        "functions": functions,
-        "data": data,
-    }
+    # .abilist files are ASCII with \n line endings. Decoding the raw bytes
+    # avoids the TextIOWrapper layer and its newline translation.
+    with open(path, "rb") as fh:
+        text = fh.read().decode("ascii")
+    if text and not text.endswith("\n"):
+        text += "\n"
 
+    # findall() builds the row tuples in C, without a Match object per line.
+    rows = ABILIST_LINE_RE.findall(text)
 
-def abilist_metadata(source: pathlib.Path, abilist: pathlib.Path):
-    """Resolve a .abilist path into metadata about that list."""
+    # A match spans exactly one whole line, so every line matched if and only
+    # if the counts agree. Otherwise find the offending line for the error.
+    if len(rows) != text.count("\n"):
+        for line in text.split("\n"):
+            if not ABILIST_LINE_RE.match(line + "\n"):
+                raise Exception("malformed line in %s: %s" % (path, line))
 
-    rel = abilist.relative_to(source)
-    assert rel.parts[0] == "sysdeps"
-    assert rel.name.endswith(".abilist")
+    for symver, symbol, typ, address in rows:
+        # A handful of versions is shared by thousands of symbols.
+        symver = sys.intern(symver)
 
-    os = rel.parts[1]
-    assert os in ("generic", "mach", "unix")
+        if typ == "F":
+            functions.append((symbol, symver))
+        elif typ == "D" and address:
+            data.append((symbol, {"version": symver, "address": address}))
+        else:
+            raise Exception(
+                "unhandled symbol type in %s: %s %s %s" % (path, symver, symbol, typ)
+            )
 
-    arch = None
-    subarch = []
+    return {
+        "functions": dict(functions),
+        "data": dict(data),
+    }
 
-    if os == "mach":
-        assert rel.parts[2] == "hurd"
-        assert len(rel.parts) == 5
 
-        arch = rel.parts[3]
-    elif os == "unix":
-        assert rel.parts[2] == "sysv"
-        assert rel.parts[3] == "linux"
+def abilist_metadata(source: str, abilist: str):
+    """Resolve a .abilist path into metadata about that list.
 
-        arch = rel.parts[4]
+    ``abilist`` must be a path under ``source`` as returned by
+    find_abilist_files().
+    """
 
-        # There are additional path components that qualify this ABI.
-        if len(rel.parts) > 6:
-            subarch = list(rel.parts[5:-1])
+    rel = abilist[len(source.rstrip("/")) + 1 :]
 
-    else:
-        assert "unhandled os"
+    m = ABILIST_PATH_RE.fullmatch(rel)
+    if not m:
+        raise Exception("unhandled .abilist path: %s" % rel)
 
-    lib = rel.name[:-8]
+    os = m.group(1).partition("/")[0]
+    arch = m.group(2)
+    # There are additional path components that qualify this ABI.
+    subarch = tuple(m.group(3).split("/")) if m.group(3) else ()
+    lib = m.group(4)
+
+    if os == "mach" and subarch:
+        raise Exception("unexpected subarch in %s" % rel)
 
     return {
         "os": os,
@@ -352,42 +379,95 @@ def abilist_metadata(source: pathlib.Path, abilist: pathlib.Path):
     }
 
 
-def target_abi(target: str, source: pathlib.Path):
-    """Resolves the ABI for a given named target."""
+def resolve_abis(source: pathlib.Path, files, parsed):
+    """Resolves the ABI of every distinct set of sources in TARGETS_TO_SOURCES.
 
-    assert target in TARGETS_TO_SOURCES
+    ``parsed`` maps each path in ``files`` to its parsed content. Returns a
+    dict mapping ``frozenset(sources)`` to a dict of library name to parsed
+    content.
+    """
 
-    libs = {}
+    abis = {frozenset(sources): {} for sources in TARGETS_TO_SOURCES.values()}
 
-    for p in find_abilist_files(source):
-        meta = abilist_metadata(source, p)
+    # Map each (os, arch, subarch) to the ABIs it contributes to so every
+    # file is dispatched directly to the ABIs it belongs to.
+    dispatch = collections.defaultdict(list)
 
-        for os, arch, subarch in TARGETS_TO_SOURCES[target]:
-            if meta["os"] != os or meta["arch"] != arch or meta["subarch"] != subarch:
-                continue
+    for key, libs in abis.items():
+        for os_arch_subarch in key:
+            dispatch[os_arch_subarch].append(libs)
 
-            lib = meta["lib"]
+    source = str(source)
 
+    for p in files:
+        meta = abilist_metadata(source, p)
+        lib = meta["lib"]
+
+        for libs in dispatch.get((meta["os"], meta["arch"], meta["subarch"]), ()):
             # Each library should only be defined once per target.
             assert lib not in libs
 
-            libs[lib] = parse_abilist(p)
+            libs[lib] = parsed[p]
+
+    return abis
 
-    if not libs:
-        print("warning: no libraries found for %s" % target, file=sys.stderr)
 
-    return libs
+def dump_json(value) -> bytes:
+    """Serialize a value to indented JSON with sorted keys.
+
+    orjson is used when available. Both code paths produce identical output.
+    """
+    if orjson:
+        return orjson.dumps(value, option=orjson.OPT_INDENT_2 | orjson.OPT_SORT_KEYS)
+
+    return json.dumps(value, indent=2, sort_keys=True).encode("utf-8")
 
 
 def main(source: pathlib.Path, dest: pathlib.Path):
     dest.mkdir(0o775, parents=True, exist_ok=True)
 
-    for target in TARGETS_TO_SOURCES:
-        abi = target_abi(target, source)
+    # The set of files, their metadata, and their content are the same for
+    # every target. A file is typically used by several targets, so parse
+    # each one once and share the result. The parsed data is only read
+    # during serialization, so sharing it between targets is safe.
+    files = find_abilist_files(source)
+
+    # Parsing is independent per file, so spread it across cores.
+    with concurrent.futures.ProcessPoolExecutor() as e:
+        parsed = dict(zip(files, e.map(parse_abilist, files, chunksize=8)))
+
+    abis = resolve_abis(source, files, parsed)
+
+    # Many targets share the same sources and therefore the same ABI, so
+    # serialize each distinct ABI only once. Outputs identical to one
+    # already written are hardlinked to it when the filesystem allows.
+    encoded = {}
+    written = {}
+
+    for target, sources in TARGETS_TO_SOURCES.items():
+        key = frozenset(sources)
+
+        if not abis[key]:
+            print("warning: no libraries found for %s" % target, file=sys.stderr)
+
         dest_path = dest / ("%s.json" % target)
 
-        with dest_path.open("w", encoding="utf-8") as fh:
-            json.dump(abi, fh, indent=4, sort_keys=True)
+        # Never write through an existing file: it may be a hardlink to
+        # another output from a previous run.
+        dest_path.unlink(missing_ok=True)
+
+        if key in written:
+            try:
+                os.link(written[key], dest_path)
+                continue
+            except OSError:
+                pass
+
+        if key not in encoded:
+            encoded[key] = dump_json(abis[key])
+
+        dest_path.write_bytes(encoded[key])
+        written.setdefault(key, dest_path)
 
 
 if __name__ == "__main__":